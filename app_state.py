@@ -0,0 +1,32 @@
+"""
+Estado compartilhado entre o script Streamlit e a thread de vídeo do webrtc.
+
+O `recv` do streamlit-webrtc roda em uma thread separada; cada acesso a
+`st.session_state` lá passa por verificações de ScriptRunContext e exigia
+um try/except por frame. Este módulo mantém um objeto simples, importado
+uma única vez por processo, que a sidebar escreve e a thread de vídeo lê
+por acesso direto a atributos. Leituras/escritas de referências únicas são
+atômicas no CPython, então os campos escalares dispensam lock.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class SharedState:
+    """Estado lido pela thread de vídeo a cada frame."""
+    tracking: bool = False
+    calibrating: bool = False
+    sensitivity: float = 1.0
+    scale_factor: float = 1.0
+
+    # Escritos pela thread de vídeo, lidos pelo script principal
+    calibration_success: bool = False
+    last_calibration_time: int = 0  # time.monotonic_ns()
+
+    # Controlador registrado pelo VideoProcessor para o botão Pausar
+    # poder chamar reset() a partir do script principal
+    mouse_controller: Optional[object] = None
+
+
+shared = SharedState()
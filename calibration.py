@@ -1,35 +1,31 @@
 """
 Módulo para calibração de sensibilidade baseada na distância da mão à câmera.
 """
+import numpy as np
 import streamlit as st
-import utils
 from typing import Optional, Tuple
 
 
 def calculate_scale_factor(landmarks) -> Optional[float]:
     """
     Calcula o fator de escala baseado na distância entre landmarks de referência.
-    
+
     Usa a distância entre o pulso (landmark 0) e a base do dedo médio (landmark 9)
     como referência para estimar a distância da mão à câmera.
-    
+
     Args:
-        landmarks: Objeto HandLandmarks do MediaPipe
-    
+        landmarks: Array (21, 3) float32 de landmarks do HandTracker
+
     Returns:
         Fator de escala (float) ou None se não for possível calcular
     """
-    if landmarks is None:
+    if landmarks is None or len(landmarks) == 0:
         return None
-    
+
     try:
         # Landmarks de referência: pulso (0) e base do dedo médio (9)
-        wrist = landmarks.landmark[0]
-        middle_base = landmarks.landmark[9]
-        
-        # Calcula distância entre os landmarks
-        distance = utils.calculate_distance(wrist, middle_base)
-        
+        distance = float(np.linalg.norm(landmarks[9, :2] - landmarks[0, :2]))
+
         if distance == 0 or distance == float('inf'):
             return None
         
@@ -76,10 +72,10 @@ def show_calibration_modal():
 def perform_calibration(landmarks) -> Tuple[bool, Optional[float]]:
     """
     Realiza a calibração e armazena o fator de escala.
-    
+
     Args:
-        landmarks: Objeto HandLandmarks do MediaPipe
-    
+        landmarks: Array (21, 3) float32 de landmarks do HandTracker
+
     Returns:
         Tupla (sucesso, fator_escala)
     """
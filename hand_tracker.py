@@ -6,10 +6,15 @@ import mediapipe as mp
 import streamlit as st
 from typing import Optional, Tuple, Any
 import numpy as np
+import utils
+
+# Garante os caminhos otimizados (SIMD/IPP) do OpenCV para resize/cvtColor.
+# O T-API (UMat/OpenCL) não compensa neste pipeline: o MediaPipe consome
+# ndarray na CPU, e o download GPU->CPU por frame custaria mais do que os
+# kernels economizam em imagens 640x480.
+cv2.setUseOptimized(True)
 
 mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-mp_drawing_styles = mp.solutions.drawing_styles
 
 
 @st.cache_resource
@@ -23,6 +28,10 @@ def get_hand_model():
     return mp_hands.Hands(
         static_image_mode=False,
         max_num_hands=1,
+        # Modelo "lite" (complexity 0): metade dos FLOPs do modelo padrão,
+        # precisão suficiente para os gestos usados aqui. A inferência é o
+        # custo dominante por frame, então isso reduz a latência de detecção.
+        model_complexity=0,
         min_detection_confidence=0.5,
         min_tracking_confidence=0.5
     )
@@ -33,53 +42,92 @@ class HandTracker:
     Classe para rastreamento de mão usando MediaPipe.
     """
     
-    def __init__(self):
-        """Inicializa o rastreador de mão."""
+    def __init__(self, draw_landmarks: bool = True):
+        """
+        Inicializa o rastreador de mão.
+
+        Args:
+            draw_landmarks: Se False, não desenha os landmarks no frame
+                (modo headless - economiza todo o custo de renderização)
+        """
         self.hands = get_hand_model()
         self.frame_width = 640
         self.frame_height = 480
+        self.draw_landmarks = draw_landmarks
+        # Conexões da mão como array (M, 2) int32, convertido uma única vez -
+        # HAND_CONNECTIONS é um frozenset de tuplas, caro de iterar por frame
+        self._connections = np.array(
+            sorted(mp_hands.HAND_CONNECTIONS), dtype=np.int32
+        )
+        # Vetor de escala para converter coordenadas normalizadas em pixels
+        # numa única expressão vetorizada
+        self._scale_wh = np.array(
+            [self.frame_width, self.frame_height], dtype=np.float32
+        )
+        # Buffer RGB pré-alocado para a conversão BGR->RGB - evita um malloc
+        # e uma escrita de ~900KB por frame. Hands.process() é síncrono, então
+        # um único buffer é seguro (sem leitura após o retorno).
+        self._rgb_buf = np.empty(
+            (self.frame_height, self.frame_width, 3), dtype=np.uint8
+        )
     
-    def process_frame(self, frame) -> Tuple[Optional[Any], np.ndarray]:
+    def process_frame(self, frame) -> Tuple[Optional[Any], Optional[np.ndarray], np.ndarray]:
         """
         Processa um frame e detecta landmarks da mão.
-        
+
         Args:
             frame: Frame OpenCV (BGR)
-        
+
         Returns:
-            Tupla (landmarks, frame_anotado)
+            Tupla (landmarks, landmarks_np, frame_anotado)
             - landmarks: Objeto HandLandmarks ou None se não detectado
+            - landmarks_np: Array (21, 3) float32 com os landmarks (x, y, z),
+              ou None se não detectado. O protobuf é percorrido uma única vez
+              aqui; os consumidores indexam o array em vez de re-acessar
+              atributos landmark.x/y a cada uso
             - frame_anotado: Frame com landmarks desenhados
         """
-        # Redimensiona frame para 640x480
-        frame_resized = cv2.resize(frame, (self.frame_width, self.frame_height))
-        
+        # Redimensiona para 640x480 apenas se necessário - com o
+        # media_stream_constraints correto o frame já chega nesse tamanho
+        if frame.shape[1] != self.frame_width or frame.shape[0] != self.frame_height:
+            annotated_frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+        else:
+            annotated_frame = frame
+
         # Converte BGR para RGB (MediaPipe requer RGB)
-        frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-        
+        frame_rgb = cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB,
+                                 dst=self._rgb_buf)
+
         # Processa frame
         results = self.hands.process(frame_rgb)
-        
-        # Frame anotado (começa com o frame original)
-        annotated_frame = frame_resized.copy()
-        
+
+        # Desenha direto no frame redimensionado - o chamador não usa o
+        # original, então a cópia de ~900KB por frame era desperdício
+
         # Desenha landmarks se detectado
         if results.multi_hand_landmarks:
             # Pega a primeira mão detectada
             hand_landmarks = results.multi_hand_landmarks[0]
-            
-            # Desenha landmarks e conexões
-            mp_drawing.draw_landmarks(
-                annotated_frame,
-                hand_landmarks,
-                mp_hands.HAND_CONNECTIONS,
-                mp_drawing_styles.get_default_hand_landmarks_style(),
-                mp_drawing_styles.get_default_hand_connections_style()
-            )
-            
-            return hand_landmarks, annotated_frame
+
+            # Converte os 21 landmarks para um array (21, 3) de uma só vez -
+            # uma única travessia do protobuf por frame
+            landmarks_np = utils.landmarks_to_array(hand_landmarks)
+
+            # Desenha landmarks e conexões em lote: uma chamada de polylines
+            # para todas as conexões em vez dos ~42 cv2.line/cv2.circle que o
+            # mp_drawing.draw_landmarks emitia em loop Python
+            if self.draw_landmarks:
+                # Converte todos os landmarks para pixels de uma vez
+                pts = (landmarks_np[:, :2] * self._scale_wh).astype(np.int32)
+                lines = pts[self._connections]  # (M, 2, 2)
+                cv2.polylines(annotated_frame, lines, False, utils.COLOR_GREEN, 2)
+                for x, y in pts:
+                    cv2.circle(annotated_frame, (int(x), int(y)), 3,
+                               utils.COLOR_GREEN, -1)
+
+            return hand_landmarks, landmarks_np, annotated_frame
         else:
-            return None, annotated_frame
+            return None, None, annotated_frame
     
     def get_landmark(self, landmarks, landmark_index: int):
         """
@@ -92,9 +140,14 @@ class HandTracker:
         Returns:
             Landmark ou None
         """
-        if landmarks is None or landmark_index >= len(landmarks.landmark):
+        if landmarks is None:
+            return None
+        # Resolve o campo repeated do protobuf uma única vez - cada acesso a
+        # landmarks.landmark passa pelo descritor de atributo do protobuf
+        lms = landmarks.landmark
+        if landmark_index >= len(lms):
             return None
-        return landmarks.landmark[landmark_index]
+        return lms[landmark_index]
     
     def get_landmark_pixel_coords(self, landmark, frame_width: int, frame_height: int) -> Tuple[int, int]:
         """
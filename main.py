@@ -8,6 +8,7 @@ import numpy as np
 import time
 import av
 from streamlit_webrtc import webrtc_streamer, VideoProcessorBase, RTCConfiguration
+from app_state import shared
 from hand_tracker import HandTracker
 from mouse_controller import MouseController
 import calibration
@@ -40,17 +41,22 @@ if 'position_history' not in st.session_state:
 if 'calibrating' not in st.session_state:
     st.session_state.calibrating = False
 
-if 'hand_tracker' not in st.session_state:
-    st.session_state.hand_tracker = HandTracker()
-
-if 'mouse_controller' not in st.session_state:
-    st.session_state.mouse_controller = MouseController()
-
-if 'last_calibration_time' not in st.session_state:
-    st.session_state.last_calibration_time = 0
+# Resultados da thread de vídeo têm precedência sobre o sync de escrita:
+# se uma calibração acabou de terminar, aplica o fator novo no
+# session_state ANTES de sincronizar para baixo - senão o rerun
+# sobrescreveria shared.scale_factor com o valor antigo e rearmaria
+# shared.calibrating, perdendo a calibração. A flag calibration_success
+# permanece para o bloco de mensagem da área principal consumi-la.
+if shared.calibration_success:
+    st.session_state.scale_factor = shared.scale_factor
+    st.session_state.calibrating = False
 
-if 'calibration_success' not in st.session_state:
-    st.session_state.calibration_success = False
+# Sincroniza o estado compartilhado lido pela thread de vídeo
+# (ver app_state - recv não acessa mais o session_state)
+shared.tracking = st.session_state.tracking
+shared.calibrating = st.session_state.calibrating
+shared.sensitivity = st.session_state.sensitivity
+shared.scale_factor = st.session_state.scale_factor
 
 # CSS customizado para melhorar a aparência
 st.markdown("""
@@ -88,166 +94,149 @@ class VideoProcessor(VideoProcessorBase):
     
     def __init__(self):
         super().__init__()
-        # Não inicializa aqui - será feito no recv quando session_state estiver disponível
-        self.hand_tracker = None
-        self.mouse_controller = None
-        # Cache do estado de tracking para evitar problemas de acesso ao session_state
-        # Inicializa como True por padrão - será atualizado no primeiro frame
-        self._tracking_cache = True
-        self._last_state_check = 0
-    
-    def _ensure_initialized(self):
-        """Garante que os componentes estão inicializados."""
-        try:
-            # Sempre tenta usar as instâncias do session_state primeiro
-            if 'hand_tracker' in st.session_state:
-                self.hand_tracker = st.session_state.hand_tracker
-            else:
-                if self.hand_tracker is None:
-                    self.hand_tracker = HandTracker()
-                    st.session_state.hand_tracker = self.hand_tracker
-            
-            if 'mouse_controller' in st.session_state:
-                self.mouse_controller = st.session_state.mouse_controller
-            else:
-                if self.mouse_controller is None:
-                    self.mouse_controller = MouseController()
-                    st.session_state.mouse_controller = self.mouse_controller
-        except:
-            # Se session_state não estiver disponível, cria instâncias locais
-            if self.hand_tracker is None:
-                self.hand_tracker = HandTracker()
-            if self.mouse_controller is None:
-                self.mouse_controller = MouseController()
-    
+        self.hand_tracker = HandTracker()
+        self.mouse_controller = MouseController()
+        # Registra o controlador no estado compartilhado para o botão
+        # Pausar poder chamar reset() a partir do script principal
+        shared.mouse_controller = self.mouse_controller
+        # A inferência do MediaPipe roda em frames alternados; nos frames
+        # pulados o cursor usa os últimos landmarks extrapolados linearmente
+        self._frame_idx = 0
+        self._last_landmarks_np = None
+        self._prev_landmarks_np = None
+        # Frames de saída pré-alocados (ring de 2 slots: o lado webrtc pode
+        # ainda estar codificando o frame anterior enquanto o próximo é
+        # preenchido) - evita alocar um AVFrame novo a cada recv
+        self._out_frames = [av.VideoFrame(640, 480, 'bgr24') for _ in range(2)]
+        self._out_idx = 0
+        # Contexto de renderização reutilizado pelos desenhos - cacheia os
+        # derivados da resolução (recalculados só se a câmera renegociar)
+        self._render_ctx = utils.RenderContext()
+        # Overlay persistente: o feedback de gestos pinta nele e o resultado
+        # é copiado (mascarado) para o frame em uma única passada por frame
+        self._overlay = utils.Overlay()
+
     def recv(self, frame):
         """
         Processa cada frame recebido.
-        
+
         Args:
             frame: Frame de vídeo do streamlit-webrtc
-        
+
         Returns:
             Frame processado e anotado
         """
-        # Garante que os componentes estão inicializados
-        self._ensure_initialized()
-        
-        # Tenta atualizar o cache de tracking logo no início (antes de processar)
-        # Isso garante que temos o estado mais recente
-        # Atualiza SEMPRE a cada frame para garantir que está sincronizado
-        try:
-            if hasattr(st, 'session_state') and st.session_state is not None:
-                new_tracking = st.session_state.get('tracking', self._tracking_cache)
-                self._tracking_cache = new_tracking
-        except Exception:
-            # Se não conseguir acessar, mantém o cache atual
-            # Isso é esperado na thread do webrtc às vezes
-            pass
-        
+        # Lê o estado compartilhado por acesso direto a atributos - sem
+        # passar pelo proxy do session_state (e seu try/except) por frame
+        tracking = shared.tracking
+
+        # Uma única leitura de relógio por frame, compartilhada pelos
+        # debounces (calibração e clique duplo)
+        now_ns = time.monotonic_ns()
+
         # Converte frame para array numpy (BGR)
+        # O redimensionamento para 640x480 fica a cargo do process_frame
+        # (e normalmente nem acontece, pois o media_stream_constraints já
+        # pede essa resolução ao navegador)
         img = frame.to_ndarray(format="bgr24")
+
+        # A imagem NÃO é mais invertida aqui: o espelhamento é feito apenas
+        # na saída (preview) e na coordenada X do cursor, poupando uma cópia
+        # de frame inteiro antes do MediaPipe
+        # Processa frame com MediaPipe em frames alternados - a inferência é
+        # o custo dominante, então pular metade dos frames dobra a folga de
+        # CPU; o cursor continua suave graças à extrapolação de velocidade
+        process_this = (self._frame_idx % 2 == 0) or self._last_landmarks_np is None
+        self._frame_idx += 1
+
+        if process_this:
+            landmarks, landmarks_np, annotated_frame = self.hand_tracker.process_frame(img)
+            if landmarks_np is not None:
+                self._prev_landmarks_np = self._last_landmarks_np
+                self._last_landmarks_np = landmarks_np
+            else:
+                # Rastreamento perdido - descarta o histórico de extrapolação
+                self._prev_landmarks_np = None
+                self._last_landmarks_np = None
+        else:
+            # Frame pulado: extrapola os landmarks pela velocidade do último
+            # par de frames processados (sem desenhar, para ampliar a economia).
+            # last e prev distam DOIS frames de câmera e o frame pulado está
+            # um frame após last, então o avanço é metade do delta:
+            # last + 0.5*(last - prev)
+            landmarks = None
+            if self._prev_landmarks_np is not None:
+                landmarks_np = (1.5 * self._last_landmarks_np -
+                                0.5 * self._prev_landmarks_np)
+            else:
+                landmarks_np = self._last_landmarks_np
+            if img.shape[1] != 640 or img.shape[0] != 480:
+                img = cv2.resize(img, (640, 480))
+            annotated_frame = img
         
-        # Redimensiona se necessário
-        img = cv2.resize(img, (640, 480))
-        
-        # Inverte horizontalmente a imagem (espelho) para corresponder ao movimento
-        img = cv2.flip(img, 1)
-        
-        # Processa frame com MediaPipe
-        landmarks, annotated_frame = self.hand_tracker.process_frame(img)
-        
-        # Obtém estado atual do session_state
-        # IMPORTANTE: streamlit-webrtc roda em thread separada, então precisa verificar sempre
-        # Atualiza cache a cada frame para garantir sincronização máxima
-        calibrating = False
-        
-        try:
-            # Tenta acessar session_state a cada frame para máxima responsividade
-            if hasattr(st, 'session_state') and st.session_state is not None:
-                # Força atualização do cache de tracking
-                new_tracking = st.session_state.get('tracking', self._tracking_cache)
-                self._tracking_cache = new_tracking  # Sempre atualiza, mesmo se igual
-                calibrating = st.session_state.get('calibrating', False)
-        except Exception:
-            # Se não conseguir acessar session_state, mantém valores em cache
-            # Isso é esperado na thread do webrtc às vezes
-            pass
-        
-        # Usa o cache atualizado
-        tracking = self._tracking_cache
-        
-        if calibrating and landmarks is not None:
-            current_time = time.time()
-            last_calibration_time = st.session_state.get('last_calibration_time', 0)
-            if current_time - last_calibration_time > 0.5:
-                scale_factor = calibration.calculate_scale_factor(landmarks)
+        if shared.calibrating and landmarks is not None:
+            if now_ns - shared.last_calibration_time > 500_000_000:
+                scale_factor = calibration.calculate_scale_factor(landmarks_np)
                 if scale_factor is not None:
-                    try:
-                        st.session_state.scale_factor = scale_factor
-                        st.session_state.calibrating = False
-                        st.session_state.calibration_success = True
-                        st.session_state.last_calibration_time = current_time
-                    except:
-                        pass
+                    shared.scale_factor = scale_factor
+                    shared.calibrating = False
+                    shared.calibration_success = True
+                    shared.last_calibration_time = now_ns
         
-        # Desenha feedback visual e controla mouse
+        # Desenha feedback visual (apenas em frames processados)
         if landmarks is not None:
-            # Obtém landmarks específicos
-            thumb = self.hand_tracker.get_landmark(landmarks, 4)
-            middle = self.hand_tracker.get_landmark(landmarks, 12)
-            index = self.hand_tracker.get_landmark(landmarks, 8)
-            
-            # Desenha feedback de gestos
-            annotated_frame = utils.draw_gesture_feedback(
+            # Desenha feedback de gestos in-place (consome o array SoA)
+            utils.draw_gesture_feedback(
                 annotated_frame,
-                landmarks,
-                thumb,
-                middle,
-                index,
-                single_click_threshold=self.mouse_controller.single_click_threshold * 640,
-                double_click_threshold=self.mouse_controller.double_click_threshold * 640
+                landmarks_np,
+                self._render_ctx,
+                single_click_threshold=self.mouse_controller.single_click_threshold,
+                double_click_threshold=self.mouse_controller.double_click_threshold,
+                overlay=self._overlay
             )
-            
-            # Controla mouse apenas se tracking estiver ativo
-            # Usa o cache do tracking (atualizado periodicamente)
+            # Compõe o overlay no frame em uma única operação
+            self._overlay.composite(annotated_frame)
+
+        # Controla mouse apenas se tracking estiver ativo (roda também nos
+        # frames pulados, com os landmarks extrapolados)
+        if landmarks_np is not None:
             if tracking:
-                # Move cursor - obtém valores do session_state de forma segura
                 try:
-                    sensitivity = st.session_state.get('sensitivity', 1.0)
-                    scale_factor = st.session_state.get('scale_factor', 1.0)
-                except:
-                    sensitivity = 1.0
-                    scale_factor = 1.0
-                
-                # Move o cursor - garante que mouse_controller está inicializado
-                # Se não estiver inicializado, tenta inicializar novamente
-                if self.mouse_controller is None:
-                    self._ensure_initialized()
-                
-                if self.mouse_controller is not None:
-                    try:
-                        # Usa landmark 0 (pulso/palma da mão) para controlar o cursor
-                        self.mouse_controller.move_cursor(
-                            landmark_index=0,  # 0 = pulso/palma da mão
-                            landmarks=landmarks,
-                            sensitivity=sensitivity,
-                            scale_factor=scale_factor
-                        )
-                        
-                        # Detecta cliques
-                        self.mouse_controller.detect_single_click(landmarks)
-                        self.mouse_controller.detect_double_click(landmarks)
-                    except Exception as e:
-                        # Ignora erros silenciosamente para não interromper o processamento
-                        pass
-        
-        # Adiciona texto de status no frame
-        # Usa o cache do tracking para mostrar o status correto
+                    # Usa landmark 0 (pulso/palma da mão) para controlar o cursor
+                    self.mouse_controller.move_cursor(
+                        landmark_index=0,  # 0 = pulso/palma da mão
+                        landmarks=landmarks_np,
+                        sensitivity=shared.sensitivity,
+                        scale_factor=shared.scale_factor
+                    )
+
+                    # Detecta cliques
+                    self.mouse_controller.detect_single_click(landmarks_np)
+                    self.mouse_controller.detect_double_click(landmarks_np, now_ns)
+                except Exception:
+                    # Ignora erros silenciosamente para não interromper o processamento
+                    pass
+
+        # Retorna frame processado espelhado (preview em modo espelho).
+        # Escreve direto no plano do frame pré-alocado; o flip horizontal é
+        # absorvido por essa única cópia obrigatória para o buffer de saída
+        out_frame = self._out_frames[self._out_idx]
+        self._out_idx ^= 1
+        plane = out_frame.planes[0]
+        dst = np.lib.stride_tricks.as_strided(
+            np.frombuffer(plane, dtype=np.uint8),
+            shape=(480, 640, 3),
+            strides=(plane.line_size, 3, 1)
+        )
+        dst[:] = annotated_frame[:, ::-1]
+
+        # Texto de status desenhado DEPOIS do espelhamento, direto no
+        # buffer de saída - desenhado antes, ele apareceria invertido no
+        # preview (as linhas de dst são contíguas, então o cv2 aceita a view)
         status_text = "Rastreando" if tracking else "Pausado"
         color_status = utils.COLOR_GREEN if tracking else utils.COLOR_RED
         cv2.putText(
-            annotated_frame,
+            dst,
             f"Status: {status_text}",
             (10, 30),
             cv2.FONT_HERSHEY_SIMPLEX,
@@ -255,9 +244,7 @@ class VideoProcessor(VideoProcessorBase):
             color_status,
             2
         )
-        
-        # Retorna frame processado
-        return av.VideoFrame.from_ndarray(annotated_frame, format="bgr24")
+        return out_frame
 
 
 # Sidebar
@@ -272,10 +259,11 @@ with st.sidebar:
         width='stretch'
     ):
         st.session_state.tracking = not st.session_state.tracking
-        if not st.session_state.tracking:
-            st.session_state.mouse_controller.reset()
-        # Força rerun para atualizar o estado
-        st.rerun()
+        shared.tracking = st.session_state.tracking
+        if not st.session_state.tracking and shared.mouse_controller is not None:
+            shared.mouse_controller.reset()
+        # Sem st.rerun() manual: o clique no botão já agenda um rerun, e a
+        # thread de vídeo enxerga o novo valor direto pelo estado compartilhado
     
     st.markdown("---")
     
@@ -288,12 +276,14 @@ with st.sidebar:
         step=0.1,
         help="Ajuste a sensibilidade do movimento do cursor"
     )
-    
+    shared.sensitivity = st.session_state.sensitivity
+
     st.markdown("---")
-    
+
     # Botão de calibração
     if st.button("⚙️ Calibrar", width='stretch'):
         st.session_state.calibrating = True
+        shared.calibrating = True
     
     # Modal de calibração
     if st.session_state.calibrating:
@@ -309,10 +299,12 @@ with st.sidebar:
             
             if st.button("🎯 Calibrar Agora", type="primary", width='stretch'):
                 st.session_state.calibrating = True
+                shared.calibrating = True
                 st.rerun()
-            
+
             if st.button("❌ Cancelar", width='stretch'):
                 st.session_state.calibrating = False
+                shared.calibrating = False
                 st.rerun()
     
     st.markdown("---")
@@ -338,7 +330,7 @@ with st.sidebar:
     
     # Informações técnicas
     with st.expander("ℹ️ Informações Técnicas"):
-        st.write(f"**Fator de Escala:** {st.session_state.scale_factor:.2f}")
+        st.write(f"**Fator de Escala:** {shared.scale_factor:.2f}")
         st.write(f"**Sensibilidade:** {st.session_state.sensitivity:.1f}")
         st.write(f"**Status:** {'Ativo' if st.session_state.tracking else 'Inativo'}")
 
@@ -367,7 +359,12 @@ else:
         key="mouse-control",
         video_processor_factory=VideoProcessor,
         rtc_configuration=rtc_configuration,
-        media_stream_constraints={"video": True, "audio": False},
+        media_stream_constraints={
+            # Pede 640x480 direto ao navegador - evita redimensionar cada
+            # frame no servidor (um resample bilinear de frame inteiro)
+            "video": {"width": 640, "height": 480},
+            "audio": False,
+        },
     )
     
     # Verifica se o stream está ativo
@@ -375,9 +372,12 @@ else:
         st.success("✅ Câmera ativa! Mova sua mão para controlar o cursor.")
         
         # Mostra mensagem de calibração bem-sucedida se aplicável
-        if 'calibration_success' in st.session_state and st.session_state.calibration_success:
-            calibration_message.success(f"✅ Calibração concluída! Fator de escala: {st.session_state.scale_factor:.2f}")
-            st.session_state.calibration_success = False
+        # (a thread de vídeo escreve o resultado no estado compartilhado)
+        if shared.calibration_success:
+            st.session_state.scale_factor = shared.scale_factor
+            st.session_state.calibrating = False
+            calibration_message.success(f"✅ Calibração concluída! Fator de escala: {shared.scale_factor:.2f}")
+            shared.calibration_success = False
             time.sleep(2)
             calibration_message.empty()
     else:
@@ -1,14 +1,57 @@
 """
 Módulo para controle do cursor do mouse e detecção de gestos.
 """
+import numpy as np
 import pyautogui
 import time
-from collections import deque
-import utils
+import platform_mouse
 
-# Limites de segurança do PyAutoGUI
-pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.01  # Pequena pausa entre ações
+try:
+    from numba import njit
+except ImportError:
+    njit = None  # numba é opcional - sem ele usa o fallback em Python puro
+
+# O failsafe do PyAutoGUI consulta a posição do cursor no display server a
+# cada ação; o platform_mouse faz a mesma verificação de canto com uma
+# comparação barata sobre as coordenadas de destino, então o nativo fica
+# desligado até no backend de fallback
+pyautogui.FAILSAFE = False
+pyautogui.PAUSE = 0  # Sem pausa forçada entre ações - limitava o loop a ~100 Hz
+
+
+def _remap_and_smooth(x, y, a, b, alpha, ema_x, ema_y, warmed):
+    """
+    Remapeia as coordenadas normalizadas e aplica a média móvel exponencial.
+
+    O remapeamento (margem, escala, sensibilidade) já vem colapsado nos
+    coeficientes afins `a` e `b` pré-computados em update_mapping, e a
+    suavização é uma EMA de um polo: s = alpha*x + (1-alpha)*s. Custo O(1)
+    com dois floats de estado, sem ring buffer nem soma por frame.
+
+    Args:
+        x, y: Coordenadas normalizadas (0-1) da palma da mão
+        a, b: Coeficientes do mapeamento afim x' = clamp(a*x + b)
+        alpha: Fator da EMA (2/(janela+1))
+        ema_x, ema_y: Estado atual da EMA
+        warmed: False na primeira amostra (a EMA é semeada com ela)
+
+    Returns:
+        Tupla (x, y) suavizada (novo estado da EMA)
+    """
+    x = max(0.0, min(1.0, a * x + b))
+    y = max(0.0, min(1.0, a * y + b))
+
+    if not warmed:
+        return x, y
+
+    one_minus = 1.0 - alpha
+    return alpha * x + one_minus * ema_x, alpha * y + one_minus * ema_y
+
+
+if njit is not None:
+    _remap_and_smooth = njit(cache=True, fastmath=True)(_remap_and_smooth)
+    # Aquece a compilação no import para não pagar o JIT no primeiro frame
+    _remap_and_smooth(0.5, 0.5, 1.0, 0.0, 0.5, 0.5, 0.5, True)
 
 
 class MouseController:
@@ -24,18 +67,61 @@ class MouseController:
             smoothing_window: Tamanho da janela para suavização (média móvel)
         """
         self.smoothing_window = smoothing_window
-        self.position_history = deque(maxlen=smoothing_window)
-        self.last_double_click_time = 0.0
-        self.double_click_debounce = 0.5  # 0.5 segundos entre cliques duplos
+        # Suavização por média móvel exponencial: O(1), dois floats de
+        # estado. Alpha calibrado para resposta equivalente à janela antiga
+        self.alpha = 2.0 / (smoothing_window + 1)
+        self.ema_x = 0.0
+        self.ema_y = 0.0
+        self._sample_count = 0
+        # Cacheia as dimensões da tela (pyautogui.size() faz uma chamada ao
+        # sistema a cada invocação - evita esse custo no loop de frames)
+        self.screen_width, self.screen_height = pyautogui.size()
+        # Debounce em nanossegundos inteiros sobre o relógio monotônico -
+        # imune a saltos do relógio de parede e sem aritmética de float
+        self.last_double_click_time = 0
+        self.double_click_debounce = 500_000_000  # 0.5 s entre cliques duplos
         
         # Limiares padrão (em pixels normalizados, será ajustado pela calibração)
         self.single_click_threshold = 0.05  # ~30px em frame 640x480
         self.double_click_threshold = 0.05
+        # Versões ao quadrado, para comparar com distâncias sem raiz quadrada
+        self.single_click_threshold_sq = self.single_click_threshold ** 2
+        self.double_click_threshold_sq = self.double_click_threshold ** 2
         
         # Estado do último clique
         self.last_single_click_state = False
         self.last_double_click_state = False
-    
+
+        # Coeficientes do mapeamento afim webcam->tela (margem + escala +
+        # sensibilidade colapsados em x' = a*x + b); recalculados apenas
+        # quando sensibilidade/escala mudam
+        self._margin = 0.1  # zona central de 80% mapeia para 100% da tela
+        self._map_sens = None
+        self._map_scale = None
+        self.update_mapping(1.0, 1.0)
+
+    def update_mapping(self, sensitivity: float, scale_factor: float,
+                       margin: float = None):
+        """
+        Recalcula os coeficientes do mapeamento afim webcam->tela.
+
+        As três transformações sequenciais (expansão da margem, escala +
+        sensibilidade ao redor do centro, clamp) colapsam algebricamente em
+        x' = clamp(a*x + b), com a = scale*sens/(1-2*margin) e b = 0.5*(1-a).
+
+        Args:
+            sensitivity: Fator de sensibilidade (0.5 a 3.0)
+            scale_factor: Fator de escala da calibração
+            margin: Fração de margem da webcam ignorada em cada lado
+        """
+        if margin is not None:
+            self._margin = margin
+        a = scale_factor * sensitivity / (1.0 - 2.0 * self._margin)
+        self._map_a = a
+        self._map_b = 0.5 * (1.0 - a)
+        self._map_sens = sensitivity
+        self._map_scale = scale_factor
+
     def move_cursor(self, landmark_index, landmarks, sensitivity: float = 1.0, 
                    scale_factor: float = 1.0) -> bool:
         """
@@ -43,63 +129,49 @@ class MouseController:
         
         Args:
             landmark_index: Índice do landmark da palma (0 = pulso/palma)
-            landmarks: Objeto HandLandmarks do MediaPipe
+            landmarks: Array (21, 3) float32 de landmarks do HandTracker
             sensitivity: Fator de sensibilidade (0.5 a 3.0)
             scale_factor: Fator de escala da calibração
-        
+
         Returns:
             True se o cursor foi movido, False caso contrário
         """
-        if landmarks is None or landmark_index >= len(landmarks.landmark):
+        if landmarks is None or landmark_index >= len(landmarks):
             return False
-        
+
         # Obtém coordenadas da palma da mão (landmark 0 = pulso, centro da palma)
-        palm_landmark = landmarks.landmark[landmark_index]
-        
+        palm_x = float(landmarks[landmark_index, 0])
+        palm_y = float(landmarks[landmark_index, 1])
+
         # Coordenadas normalizadas (0-1)
-        # NOTA: A imagem já é invertida antes do processamento do MediaPipe (em main.py),
-        # então os landmarks já estão nas coordenadas da imagem invertida que o usuário vê.
-        # Portanto, NÃO precisamos inverter novamente aqui.
-        x_norm = palm_landmark.x
-        y_norm = palm_landmark.y
-        
-        # Mapeia uma área maior da webcam (80% central) para 100% da tela
-        # Isso permite que o cursor chegue nas bordas da tela mesmo quando a mão
-        # está próxima das bordas da webcam, sem precisar sair da área visível
-        # Usa uma zona central de 80% que mapeia para 100% da tela
-        margin = 0.1  # 10% de margem em cada lado
-        x_norm = (x_norm - margin) / (1.0 - 2 * margin)
-        y_norm = (y_norm - margin) / (1.0 - 2 * margin)
-        
-        # Aplica fator de escala e sensibilidade
-        x_norm = (x_norm - 0.5) * scale_factor * sensitivity + 0.5
-        y_norm = (y_norm - 0.5) * scale_factor * sensitivity + 0.5
-        
-        # Limita entre 0 e 1 (permite valores ligeiramente fora para chegar nas bordas)
-        x_norm = max(0.0, min(1.0, x_norm))
-        y_norm = max(0.0, min(1.0, y_norm))
-        
-        # Adiciona ao histórico para suavização
-        self.position_history.append((x_norm, y_norm))
-        
-        # Aplica suavização
-        smoothed = utils.smooth_coordinates(self.position_history, self.smoothing_window)
-        
-        if smoothed is None:
+        # NOTA: a imagem NÃO é mais invertida antes do MediaPipe; o espelho é
+        # aplicado aqui na coordenada X (1 - x) em vez de copiar o frame.
+        # Recomputa os coeficientes afins só quando sensibilidade/escala mudam
+        if sensitivity != self._map_sens or scale_factor != self._map_scale:
+            self.update_mapping(sensitivity, scale_factor)
+
+        # Remapeamento afim + clamp + EMA em uma única chamada
+        x_smooth, y_smooth = _remap_and_smooth(
+            1.0 - palm_x, palm_y,
+            self._map_a, self._map_b,
+            self.alpha, self.ema_x, self.ema_y,
+            self._sample_count > 0
+        )
+        self.ema_x = x_smooth
+        self.ema_y = y_smooth
+        self._sample_count += 1
+
+        # Aguarda pelo menos 2 amostras antes de mover (evita salto inicial)
+        if self._sample_count < 2:
             return False
-        
-        x_smooth, y_smooth = smoothed
-        
-        # Obtém dimensões da tela
-        screen_width, screen_height = pyautogui.size()
-        
-        # Converte para coordenadas de tela
-        screen_x = int(x_smooth * screen_width)
-        screen_y = int(y_smooth * screen_height)
+
+        # Converte para coordenadas de tela (dimensões cacheadas no __init__)
+        screen_x = int(x_smooth * self.screen_width)
+        screen_y = int(y_smooth * self.screen_height)
         
         # Move o cursor
         try:
-            pyautogui.moveTo(screen_x, screen_y, duration=0.0)
+            platform_mouse.move_to(screen_x, screen_y)
             return True
         except Exception as e:
             print(f"Erro ao mover cursor: {e}")
@@ -110,28 +182,27 @@ class MouseController:
         Detecta gesto de clique simples (polegar + dedo médio).
         
         Args:
-            landmarks: Objeto HandLandmarks do MediaPipe
-        
+            landmarks: Array (21, 3) float32 de landmarks do HandTracker
+
         Returns:
             True se o clique foi detectado e executado
         """
         if landmarks is None:
             return False
-        
+
         # Landmarks: polegar (4) e dedo médio (12)
-        thumb = landmarks.landmark[4]
-        middle = landmarks.landmark[12]
-        
-        # Calcula distância
-        distance = utils.calculate_distance(thumb, middle)
-        
+        # Distância ao quadrado (evita a raiz - só comparamos com limiar)
+        dx = float(landmarks[4, 0] - landmarks[12, 0])
+        dy = float(landmarks[4, 1] - landmarks[12, 1])
+        distance_sq = dx * dx + dy * dy
+
         # Verifica se está abaixo do limiar
-        is_clicking = distance < self.single_click_threshold
+        is_clicking = distance_sq < self.single_click_threshold_sq
         
         # Detecta transição de não-clicando para clicando
         if is_clicking and not self.last_single_click_state:
             try:
-                pyautogui.click()
+                platform_mouse.click()
                 self.last_single_click_state = True
                 return True
             except Exception as e:
@@ -142,39 +213,41 @@ class MouseController:
         
         return False
     
-    def detect_double_click(self, landmarks) -> bool:
+    def detect_double_click(self, landmarks, now_ns: int = None) -> bool:
         """
         Detecta gesto de clique duplo (polegar + dedo indicador).
-        
+
         Args:
-            landmarks: Objeto HandLandmarks do MediaPipe
-        
+            landmarks: Array (21, 3) float32 de landmarks do HandTracker
+            now_ns: Timestamp de time.monotonic_ns(), lido uma vez por frame
+                pelo chamador; se None, lê o relógio aqui
+
         Returns:
             True se o clique duplo foi detectado e executado
         """
         if landmarks is None:
             return False
-        
-        # Verifica debounce
-        current_time = time.time()
-        if current_time - self.last_double_click_time < self.double_click_debounce:
+
+        # Verifica debounce (inteiros em ns sobre o relógio monotônico)
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        if now_ns - self.last_double_click_time < self.double_click_debounce:
             return False
-        
+
         # Landmarks: polegar (4) e dedo indicador (8)
-        thumb = landmarks.landmark[4]
-        index = landmarks.landmark[8]
-        
-        # Calcula distância
-        distance = utils.calculate_distance(thumb, index)
-        
+        # Distância ao quadrado (evita a raiz - só comparamos com limiar)
+        dx = float(landmarks[4, 0] - landmarks[8, 0])
+        dy = float(landmarks[4, 1] - landmarks[8, 1])
+        distance_sq = dx * dx + dy * dy
+
         # Verifica se está abaixo do limiar
-        is_clicking = distance < self.double_click_threshold
+        is_clicking = distance_sq < self.double_click_threshold_sq
         
         # Detecta transição de não-clicando para clicando
         if is_clicking and not self.last_double_click_state:
             try:
-                pyautogui.doubleClick()
-                self.last_double_click_time = current_time
+                platform_mouse.double_click()
+                self.last_double_click_time = now_ns
                 self.last_double_click_state = True
                 return True
             except Exception as e:
@@ -195,11 +268,18 @@ class MouseController:
         """
         self.single_click_threshold = single
         self.double_click_threshold = double
+        self.single_click_threshold_sq = single ** 2
+        self.double_click_threshold_sq = double ** 2
     
+    def refresh_screen_size(self):
+        """Atualiza as dimensões cacheadas da tela (útil ao trocar de monitor)."""
+        self.screen_width, self.screen_height = pyautogui.size()
+
     def reset(self):
         """Reseta o estado do controlador."""
-        self.position_history.clear()
+        self.refresh_screen_size()
+        self._sample_count = 0
         self.last_single_click_state = False
         self.last_double_click_state = False
-        self.last_double_click_time = 0.0
+        self.last_double_click_time = 0
 
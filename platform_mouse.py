@@ -0,0 +1,149 @@
+"""
+Módulo de acesso nativo ao mouse por plataforma.
+
+O PyAutoGUI adiciona uma pausa (PAUSE) após cada ação e consulta o display
+a cada chamada, o que limita a frequência do loop de controle. Este módulo
+chama as APIs nativas diretamente (user32 no Windows, Quartz no macOS,
+XTest no Linux) e cai de volta para o PyAutoGUI se a API nativa não estiver
+disponível. As dependências nativas (python-xlib, pyobjc-Quartz) já são
+instaladas pelo próprio PyAutoGUI em cada plataforma.
+"""
+import sys
+
+import pyautogui
+
+
+def _failsafe_check(x, y):
+    """
+    Verificação barata do failsafe (canto superior esquerdo da tela).
+
+    Reproduz o comportamento do pyautogui.FAILSAFE sem consultar a posição
+    atual do cursor no display server. É a única verificação de failsafe em
+    vigor - o FAILSAFE nativo do PyAutoGUI fica desativado (ver
+    mouse_controller).
+    """
+    if x <= 0 and y <= 0:
+        raise pyautogui.FailSafeException(
+            "Failsafe acionado: cursor movido para o canto superior esquerdo."
+        )
+
+
+def _pyautogui_backend():
+    """Backend de fallback usando o próprio PyAutoGUI."""
+    def move_to(x, y):
+        pyautogui.moveTo(x, y, duration=0.0)
+
+    return move_to, pyautogui.click, pyautogui.doubleClick, "pyautogui"
+
+
+def _windows_backend():
+    """Backend nativo para Windows via ctypes/user32."""
+    import ctypes
+
+    user32 = ctypes.windll.user32
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+
+    def move_to(x, y):
+        user32.SetCursorPos(int(x), int(y))
+
+    def click():
+        user32.mouse_event(MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+        user32.mouse_event(MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+
+    def double_click():
+        click()
+        click()
+
+    return move_to, click, double_click, "win32"
+
+
+def _macos_backend():
+    """Backend nativo para macOS via Quartz (CoreGraphics)."""
+    import Quartz
+
+    def move_to(x, y):
+        Quartz.CGWarpMouseCursorPosition((float(x), float(y)))
+
+    def _click_times(count):
+        position = Quartz.CGEventGetLocation(Quartz.CGEventCreate(None))
+        for click_state in range(1, count + 1):
+            for event_type in (Quartz.kCGEventLeftMouseDown,
+                               Quartz.kCGEventLeftMouseUp):
+                event = Quartz.CGEventCreateMouseEvent(
+                    None, event_type, position, Quartz.kCGMouseButtonLeft
+                )
+                Quartz.CGEventSetIntegerValueField(
+                    event, Quartz.kCGMouseEventClickState, click_state
+                )
+                Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+
+    def click():
+        _click_times(1)
+
+    def double_click():
+        _click_times(2)
+
+    return move_to, click, double_click, "quartz"
+
+
+def _linux_backend():
+    """Backend nativo para Linux/X11 via extensão XTest."""
+    from Xlib import X
+    from Xlib.display import Display
+    from Xlib.ext import xtest
+
+    display = Display()
+
+    def move_to(x, y):
+        xtest.fake_input(display, X.MotionNotify, x=int(x), y=int(y))
+        display.sync()
+
+    def _click_times(count):
+        for _ in range(count):
+            xtest.fake_input(display, X.ButtonPress, 1)
+            xtest.fake_input(display, X.ButtonRelease, 1)
+        display.sync()
+
+    def click():
+        _click_times(1)
+
+    def double_click():
+        _click_times(2)
+
+    return move_to, click, double_click, "xtest"
+
+
+def _select_backend():
+    """Seleciona o backend nativo da plataforma, com fallback para PyAutoGUI."""
+    try:
+        if sys.platform == "win32":
+            return _windows_backend()
+        if sys.platform == "darwin":
+            return _macos_backend()
+        return _linux_backend()
+    except Exception:
+        return _pyautogui_backend()
+
+
+_move_to, _click, _double_click, BACKEND = _select_backend()
+
+
+def move_to(x, y):
+    """
+    Move o cursor para (x, y) em pixels de tela.
+
+    Aplica a verificação de failsafe antes de mover.
+    """
+    _failsafe_check(x, y)
+    _move_to(x, y)
+
+
+def click():
+    """Executa um clique simples com o botão esquerdo."""
+    _click()
+
+
+def double_click():
+    """Executa um clique duplo com o botão esquerdo."""
+    _double_click()
@@ -4,8 +4,24 @@ Funções auxiliares para processamento de landmarks e suavização.
 import numpy as np
 import cv2
 from collections import deque
+from itertools import islice
+from math import hypot
 from typing import Tuple, Optional
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None  # numba é opcional - sem ele usa o fallback em Python puro
+    prange = range
+
+# Pré-resolve os pontos de entrada do OpenCV usados no caminho quente -
+# carregar um alias do módulo é mais barato que resolver o atributo em
+# cv2 a cada chamada, e o line type explícito evita o default lento
+_cv2_line = cv2.line
+_cv2_circle = cv2.circle
+_cv2_polylines = cv2.polylines
+_LINE_AA = cv2.LINE_AA
+
 # Cores do design system
 COLOR_GREEN = (0, 255, 136)  # #00FF88 - Palma da mão, rastreamento ativo
 COLOR_BLUE = (0, 136, 255)   # #0088FF - Clique simples
@@ -22,6 +38,164 @@ LANDMARK_MIDDLE = 12 # Ponta do dedo médio
 LANDMARK_WRIST = 0   # Pulso
 LANDMARK_MIDDLE_BASE = 9  # Base do dedo médio
 
+# Pares de landmarks dos gestos (polegar+médio = clique simples,
+# polegar+indicador = clique duplo), prontos para as distâncias em lote
+GESTURE_PAIRS = np.array([[LANDMARK_THUMB, LANDMARK_MIDDLE],
+                          [LANDMARK_THUMB, LANDMARK_INDEX_FINGER]],
+                         dtype=np.int32)
+
+
+def _eucl(ax, ay, bx, by):
+    """Kernel escalar da distância euclidiana (compilado pelo numba se houver)."""
+    dx = ax - bx
+    dy = ay - by
+    return (dx * dx + dy * dy) ** 0.5
+
+
+def _smoother_push(buf, sums, i, x, y):
+    """Kernel da inserção do CoordSmoother; retorna o novo índice do ring."""
+    sums[0] += x - buf[i, 0]
+    sums[1] += y - buf[i, 1]
+    buf[i, 0] = x
+    buf[i, 1] = y
+    i += 1
+    if i == buf.shape[0]:
+        i = 0
+    return i
+
+
+def _splat_landmarks(frame, pts, conns, b, g, r):
+    """
+    Rasteriza conexões (Bresenham) e pontos (círculos preenchidos, raio 3)
+    escrevendo BGR direto no buffer do frame, sem nenhuma chamada OpenCV.
+
+    Compilado com @njit(parallel=True) quando o numba está disponível -
+    cada linha/círculo é independente, então os loops externos paralelizam.
+    As linhas têm 1px (contra 2px do caminho cv2), suficiente para o
+    esqueleto da mão no preview.
+    """
+    h = frame.shape[0]
+    w = frame.shape[1]
+
+    for k in prange(conns.shape[0]):
+        x0 = pts[conns[k, 0], 0]
+        y0 = pts[conns[k, 0], 1]
+        x1 = pts[conns[k, 1], 0]
+        y1 = pts[conns[k, 1], 1]
+        dx = abs(x1 - x0)
+        dy = -abs(y1 - y0)
+        sx = 1 if x0 < x1 else -1
+        sy = 1 if y0 < y1 else -1
+        err = dx + dy
+        while True:
+            if 0 <= x0 < w and 0 <= y0 < h:
+                frame[y0, x0, 0] = b
+                frame[y0, x0, 1] = g
+                frame[y0, x0, 2] = r
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x0 += sx
+            if e2 <= dx:
+                err += dx
+                y0 += sy
+
+    for k in prange(pts.shape[0]):
+        cx = pts[k, 0]
+        cy = pts[k, 1]
+        for oy in range(-3, 4):
+            y = cy + oy
+            if y < 0 or y >= h:
+                continue
+            for ox in range(-3, 4):
+                if ox * ox + oy * oy > 9:
+                    continue
+                x = cx + ox
+                if 0 <= x < w:
+                    frame[y, x, 0] = b
+                    frame[y, x, 1] = g
+                    frame[y, x, 2] = r
+
+
+if njit is not None:
+    _eucl = njit(cache=True, fastmath=True)(_eucl)
+    _smoother_push = njit(cache=True)(_smoother_push)
+    _splat_landmarks = njit(cache=True, parallel=True)(_splat_landmarks)
+    # Aquece a compilação no import para não pagar o JIT no primeiro frame
+    _eucl(0.0, 0.0, 1.0, 1.0)
+    _smoother_push(np.zeros((2, 2), dtype=np.float32),
+                   np.zeros(2, dtype=np.float32), 0, 0.0, 0.0)
+    _splat_landmarks(np.zeros((8, 8, 3), dtype=np.uint8),
+                     np.zeros((2, 2), dtype=np.int32),
+                     np.zeros((1, 2), dtype=np.int32), 0, 0, 0)
+else:
+    def _eucl(ax, ay, bx, by):
+        """Fallback sem numba: math.hypot é uma única chamada C direto na
+        libm, sem a potência genérica ** 0.5 do kernel compilável."""
+        return hypot(ax - bx, ay - by)
+
+
+def landmarks_to_array(landmarks) -> Optional[np.ndarray]:
+    """
+    Converte os landmarks do MediaPipe em um array SoA (21, 3) float32.
+
+    O acesso a atributos do protobuf (landmark.x/y/z) é um dos caminhos
+    mais lentos do pipeline; esta conversão percorre o protobuf uma única
+    vez por frame e os consumidores passam a indexar o array.
+
+    Args:
+        landmarks: Objeto HandLandmarks do MediaPipe
+
+    Returns:
+        Array (N, 3) float32 com (x, y, z) por landmark, ou None
+    """
+    if landmarks is None:
+        return None
+
+    return np.array(
+        [(lm.x, lm.y, lm.z) for lm in landmarks.landmark],
+        dtype=np.float32
+    )
+
+
+def calculate_distance_idx(a_idx: int, b_idx: int, landmarks: np.ndarray) -> float:
+    """
+    Calcula a distância euclidiana entre dois landmarks do array SoA.
+
+    Args:
+        a_idx: Índice do primeiro landmark
+        b_idx: Índice do segundo landmark
+        landmarks: Array (N, 3) float32 de landmarks_to_array
+
+    Returns:
+        Distância euclidiana (no plano x, y)
+    """
+    return float(_eucl(landmarks[a_idx, 0], landmarks[a_idx, 1],
+                       landmarks[b_idx, 0], landmarks[b_idx, 1]))
+
+
+def calculate_distance_sq_idx(a_idx: int, b_idx: int,
+                              landmarks: np.ndarray) -> float:
+    """
+    Distância euclidiana AO QUADRADO entre dois landmarks do array SoA.
+
+    Para comparar contra um limiar fixo, use o limiar ao quadrado e
+    economize a raiz.
+
+    Args:
+        a_idx: Índice do primeiro landmark
+        b_idx: Índice do segundo landmark
+        landmarks: Array (N, 3) float32 de landmarks_to_array
+
+    Returns:
+        Distância euclidiana ao quadrado (no plano x, y)
+    """
+    dx = float(landmarks[a_idx, 0] - landmarks[b_idx, 0])
+    dy = float(landmarks[a_idx, 1] - landmarks[b_idx, 1])
+    return dx * dx + dy * dy
+
 
 def calculate_distance(landmark1, landmark2) -> float:
     """
@@ -36,172 +210,502 @@ def calculate_distance(landmark1, landmark2) -> float:
     """
     if landmark1 is None or landmark2 is None:
         return float('inf')
-    
-    x1, y1 = landmark1.x, landmark1.y
-    x2, y2 = landmark2.x, landmark2.y
-    
-    return np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+
+    return float(_eucl(landmark1.x, landmark1.y, landmark2.x, landmark2.y))
+
+
+def calculate_distance_sq(landmark1, landmark2) -> float:
+    """
+    Calcula a distância euclidiana AO QUADRADO entre dois landmarks.
+
+    Para comparações contra um limiar fixo, compare com o limiar ao
+    quadrado e economize a raiz quadrada.
+
+    Args:
+        landmark1: Primeiro landmark (x, y, z)
+        landmark2: Segundo landmark (x, y, z)
+
+    Returns:
+        Distância euclidiana ao quadrado
+    """
+    if landmark1 is None or landmark2 is None:
+        return float('inf')
+
+    dx = landmark2.x - landmark1.x
+    dy = landmark2.y - landmark1.y
+
+    return dx * dx + dy * dy
+
+
+def calculate_distances_batch(pairs: np.ndarray, landmarks: np.ndarray,
+                              out: Optional[np.ndarray] = None,
+                              squared: bool = False) -> np.ndarray:
+    """
+    Calcula várias distâncias entre pares de landmarks em uma só passada.
+
+    Uma subtração vetorizada e um einsum substituem K chamadas escalares -
+    mesmo com K=2 ou 3 isso elide as travessias de função em Python e deixa
+    o NumPy usar os caminhos SIMD.
+
+    Args:
+        pairs: Array (K, 2) int32 de pares de índices de landmarks
+        landmarks: Array (N, 3) float32 de landmarks_to_array
+        out: Array (K,) float32 opcional para receber o resultado
+        squared: Se True, retorna as distâncias ao quadrado (sem a raiz)
+
+    Returns:
+        Array (K,) float32 com a distância (no plano x, y) de cada par
+    """
+    p = landmarks[:, :2]
+    diffs = p[pairs[:, 0]] - p[pairs[:, 1]]
+    if out is None:
+        out = np.empty(len(pairs), dtype=np.float32)
+    np.einsum('ij,ij->i', diffs, diffs, out=out)
+    if not squared:
+        np.sqrt(out, out=out)
+    return out
+
+
+class CoordSmoother:
+    """
+    Média móvel O(1) por amostra sobre um ring buffer pré-alocado.
+
+    Mantém uma soma rolante atualizada a cada inserção (soma a amostra nova,
+    subtrai a que sai da janela), em vez de converter um deque para lista e
+    chamar np.mean a cada frame como o smooth_coordinates legado.
+    """
+
+    def __init__(self, window: int = 5):
+        """
+        Args:
+            window: Tamanho da janela da média móvel
+        """
+        self.buf = np.zeros((window, 2), dtype=np.float32)
+        self.sum = np.zeros(2, dtype=np.float32)
+        self.n = 0
+        self.i = 0
+
+    def push(self, x: float, y: float):
+        """Insere uma amostra (x, y), substituindo a mais antiga da janela."""
+        self.i = _smoother_push(self.buf, self.sum, self.i, x, y)
+        if self.n < self.buf.shape[0]:
+            self.n += 1
+
+    def value(self) -> Optional[Tuple[float, float]]:
+        """Retorna a média (x, y) atual, ou None se não há amostras."""
+        if self.n == 0:
+            return None
+        return (float(self.sum[0]) / self.n, float(self.sum[1]) / self.n)
+
+    def reset(self):
+        """Esvazia a janela."""
+        self.buf[:] = 0
+        self.sum[:] = 0
+        self.n = 0
+        self.i = 0
+
+
+class EMASmoother:
+    """
+    Média móvel exponencial de um polo: s = alpha*x + (1-alpha)*s.
+
+    Resposta de suavização comparável à média móvel de janela, mas com
+    estado de apenas dois floats - sem deque, sem ring buffer e sem
+    alocações por amostra. alpha=0.4 aproxima o corte da janela de 5
+    amostras usada historicamente (alpha = 2/(janela+1) ~ 0.33, um pouco
+    mais responsivo aqui). É a mesma suavização que o MouseController
+    aplica inline no kernel de remapeamento.
+    """
+
+    __slots__ = ('alpha', 'sx', 'sy', 'init')
+
+    def __init__(self, alpha: float = 0.4):
+        """
+        Args:
+            alpha: Fator da EMA (0 < alpha <= 1; maior = mais responsivo)
+        """
+        self.alpha = alpha
+        self.sx = 0.0
+        self.sy = 0.0
+        self.init = False
+
+    def push(self, x: float, y: float) -> Tuple[float, float]:
+        """Insere uma amostra e retorna a posição suavizada (x, y)."""
+        if not self.init:
+            self.sx = x
+            self.sy = y
+            self.init = True
+        else:
+            a = self.alpha
+            one_minus = 1.0 - a
+            self.sx = a * x + one_minus * self.sx
+            self.sy = a * y + one_minus * self.sy
+        return (self.sx, self.sy)
+
+    def reset(self):
+        """Descarta o estado (a próxima amostra semeia a EMA)."""
+        self.init = False
 
 
 def smooth_coordinates(position_history: deque, window_size: int = 5) -> Optional[Tuple[float, float]]:
     """
     Aplica média móvel para suavizar coordenadas do cursor.
-    
+
+    Obsoleto: mantido por compatibilidade com o histórico em deque. Para
+    código novo prefira EMASmoother (O(1), dois floats de estado) ou
+    CoordSmoother quando a média de janela exata for necessária.
+
     Args:
         position_history: Deque com histórico de posições (x, y)
         window_size: Tamanho da janela para média móvel
-    
+
     Returns:
         Tupla (x, y) suavizada ou None se histórico insuficiente
     """
-    if len(position_history) < 2:
-        return None
-    
-    # Usa os últimos window_size elementos ou todos se houver menos
-    recent_positions = list(position_history)[-window_size:]
-    
-    if not recent_positions:
+    n = len(position_history)
+    if n < 2:
         return None
-    
-    x_coords = [pos[0] for pos in recent_positions if pos is not None]
-    y_coords = [pos[1] for pos in recent_positions if pos is not None]
-    
-    if not x_coords or not y_coords:
+
+    # Uma única passada com acumuladores escalares sobre os últimos
+    # window_size elementos: islice percorre o deque sem materializar uma
+    # lista do tamanho do histórico, e o filtro de None é feito no caminho -
+    # zero alocações intermediárias por chamada
+    start = n - window_size
+    if start < 0:
+        start = 0
+
+    sx = 0.0
+    sy = 0.0
+    count = 0
+    for pos in islice(position_history, start, n):
+        if pos is not None:
+            sx += pos[0]
+            sy += pos[1]
+            count += 1
+
+    if count == 0:
         return None
-    
-    avg_x = np.mean(x_coords)
-    avg_y = np.mean(y_coords)
-    
-    return (avg_x, avg_y)
 
+    return (sx / count, sy / count)
 
-def draw_landmarks(frame, landmarks, hand_connections, is_tracking: bool = True):
+
+# Cache das conexões já convertidas para array, chaveado por id() do objeto
+# de conexões - HAND_CONNECTIONS é um frozenset módulo-global do MediaPipe,
+# então a conversão roda uma única vez por processo
+_CONN_CACHE = {}
+
+
+def _conns_np(hand_connections) -> Tuple[np.ndarray, int]:
     """
-    Desenha landmarks e conexões da mão no frame.
-    
+    Converte as conexões para um array (M, 2) int32 contíguo, com cache.
+
+    Iterar o frozenset de tuplas do MediaPipe por frame tem custo e ordem
+    imprevisível; aqui a travessia acontece só na primeira chamada. Retorna
+    também o maior índice referenciado, para o chamador validar os limites
+    uma única vez em vez de por conexão.
+    """
+    key = id(hand_connections)
+    cached = _CONN_CACHE.get(key)
+    if cached is None:
+        arr = np.fromiter(
+            (i for pair in hand_connections for i in pair),
+            dtype=np.int32, count=2 * len(hand_connections)
+        ).reshape(-1, 2)
+        cached = (arr, int(arr.max()) if arr.size else -1)
+        _CONN_CACHE[key] = cached
+    return cached
+
+
+class RenderContext:
+    """
+    Cacheia os valores derivados da resolução do frame entre chamadas.
+
+    As funções de desenho liam frame.shape e reconstruíam o vetor de escala
+    pixel a cada chamada; a resolução só muda quando a câmera é renegociada,
+    então o contexto recalcula apenas nesse caso. __slots__ evita o dict por
+    instância num objeto tocado a cada frame.
+    """
+
+    __slots__ = ('h', 'w', 'scale_wh')
+
+    def __init__(self):
+        self.h = 0
+        self.w = 0
+        self.scale_wh = None
+
+    def update(self, frame):
+        """Atualiza o cache se a resolução do frame mudou (barato se não)."""
+        h, w = frame.shape[:2]
+        if h != self.h or w != self.w:
+            self.h = h
+            self.w = w
+            self.scale_wh = np.array([w, h], dtype=np.float32)
+
+
+class Overlay:
+    """
+    Buffer de overlay BGR persistente, composto no frame uma vez por frame.
+
+    Os desenhos param de reescrever as linhas de cache do frame da câmera a
+    cada primitiva: as passadas de anotação pintam neste buffer zerado e o
+    resultado é copiado para o frame em uma única passada mascarada
+    (cv2.copyTo nos pixels não-zero), tocando a memória do frame uma vez
+    independente de quantos overlays dispararam. A cópia mascarada preserva
+    a semântica de sobrescrita dos desenhos diretos - uma soma saturante
+    deixaria as anotações translúcidas e invisíveis sobre regiões claras.
+    Buffer e máscara são alocados preguiçosamente no primeiro uso e
+    realocados apenas se a resolução mudar.
+    """
+
+    __slots__ = ('buf', 'mask', 'dirty')
+
+    def __init__(self):
+        self.buf = None
+        self.mask = None
+        self.dirty = False
+
+    def get(self, shape) -> np.ndarray:
+        """Retorna o buffer zerado compatível com `shape`, alocando se preciso."""
+        if self.buf is None or self.buf.shape != shape:
+            self.buf = np.zeros(shape, dtype=np.uint8)
+            self.mask = np.zeros(shape[:2], dtype=np.uint8)
+            self.dirty = False
+        return self.buf
+
+    def composite(self, frame):
+        """Copia os pixels desenhados para o frame e zera o buffer."""
+        if self.dirty:
+            # Máscara de 1 canal dos pixels pintados (reduzida no buffer
+            # cacheado), depois uma única cópia mascarada para o frame
+            self.buf.max(axis=2, out=self.mask)
+            cv2.copyTo(self.buf, self.mask, frame)
+            self.buf.fill(0)
+            self.dirty = False
+
+
+def draw_landmarks(frame, landmarks, hand_connections, ctx: RenderContext = None,
+                   is_tracking: bool = True, overlay: Overlay = None):
+    """
+    Desenha landmarks e conexões da mão no frame (modifica in-place).
+
     Args:
-        frame: Frame OpenCV
-        landmarks: Lista de landmarks do MediaPipe
+        frame: Frame OpenCV (anotado in-place, ou via overlay)
+        landmarks: Array (N, 3) float32 de landmarks_to_array
         hand_connections: Conexões entre landmarks
+        ctx: RenderContext reutilizado entre frames; se None, a escala é
+            recalculada nesta chamada
         is_tracking: Se está rastreando ativamente
+        overlay: Overlay persistente opcional; se fornecido, desenha nele
+            em vez do frame (o chamador compõe com overlay.composite)
     """
-    if landmarks is None:
-        return frame
-    
-    h, w = frame.shape[:2]
+    # Guarda única no topo - nada de frame.shape nem conversões antes dela
+    if landmarks is None or not len(landmarks):
+        return
+
+    if ctx is None:
+        ctx = RenderContext()
+    ctx.update(frame)
+    if overlay is not None:
+        frame = overlay.get(frame.shape)
+        overlay.dirty = True
     color = COLOR_GREEN if is_tracking else COLOR_GRAY
-    
-    # Desenha conexões
-    for connection in hand_connections:
-        start_idx = connection[0]
-        end_idx = connection[1]
-        
-        if start_idx < len(landmarks.landmark) and end_idx < len(landmarks.landmark):
-            start_point = landmarks.landmark[start_idx]
-            end_point = landmarks.landmark[end_idx]
-            
-            x1, y1 = int(start_point.x * w), int(start_point.y * h)
-            x2, y2 = int(end_point.x * w), int(end_point.y * h)
-            
-            cv2.line(frame, (x1, y1), (x2, y2), color, 2)
-    
-    # Desenha pontos dos landmarks
-    for landmark in landmarks.landmark:
-        x, y = int(landmark.x * w), int(landmark.y * h)
-        cv2.circle(frame, (x, y), 3, color, -1)
-    
-    return frame
 
+    # Converte todos os landmarks para pixels com uma multiplicação vetorizada
+    pts = (landmarks[:, :2] * ctx.scale_wh).astype(np.int32)
 
-def draw_gesture_feedback(frame, landmarks, thumb_landmark, middle_landmark, 
-                         index_landmark, single_click_threshold: float = 30.0,
-                         double_click_threshold: float = 30.0):
+    # Conexões já convertidas (e com o índice máximo pré-calculado) - a
+    # travessia do frozenset acontece uma única vez por processo
+    conns, conns_max = _conns_np(hand_connections)
+    if conns_max >= len(landmarks):
+        conns = conns[:0]
+
+    if njit is not None:
+        # Caminho numba: um único kernel paralelo rasteriza linhas e
+        # círculos direto no buffer do frame - zero travessias Python->C
+        _splat_landmarks(frame, pts, conns, color[0], color[1], color[2])
+        return
+
+    # Fallback cv2: todas as conexões em uma única chamada de polylines, e
+    # os pontos iterando apenas o array int já convertido. Aliases locais
+    # (LOAD_FAST) no loop em vez de resolver cv2.circle a cada iteração
+    if conns.size:
+        _cv2_polylines(frame, pts[conns], False, color, 2, _LINE_AA)
+
+    circle = _cv2_circle
+    for x, y in pts:
+        circle(frame, (int(x), int(y)), 3, color, -1, _LINE_AA)
+
+
+def _bbox_close(a_idx: int, b_idx: int, landmarks: np.ndarray,
+                threshold: float) -> bool:
     """
-    Desenha feedback visual quando gestos estão próximos do limiar.
-    
+    Pré-filtro L-infinito (Chebyshev) entre dois landmarks.
+
+    Duas subtrações e duas comparações rejeitam o caso comum (dedos longe
+    um do outro) sem pagar a distância euclidiana; a distância completa só
+    roda quando a caixa já passou.
+    """
+    return (abs(float(landmarks[a_idx, 0] - landmarks[b_idx, 0])) < threshold and
+            abs(float(landmarks[a_idx, 1] - landmarks[b_idx, 1])) < threshold)
+
+
+# Polígono unitário (16 lados) para aproximar círculos desenhados em lote
+_UNIT_CIRCLE = np.stack(
+    (np.cos(np.linspace(0.0, 2.0 * np.pi, 16, endpoint=False)),
+     np.sin(np.linspace(0.0, 2.0 * np.pi, 16, endpoint=False))),
+    axis=1
+).astype(np.float32)
+
+
+def batch_draw_circles(frame, circles):
+    """
+    Desenha vários círculos agrupados por (cor, espessura).
+
+    Cada cv2.circle individual paga uma travessia Python->C; agrupar os
+    círculos do mesmo estilo em uma única chamada de polylines (aproximando
+    cada círculo por um polígono de 16 lados) reduz as transições a uma por
+    estilo. Círculos preenchidos (espessura < 0) não têm equivalente em
+    polylines e usam o cv2.circle normal.
+
     Args:
         frame: Frame OpenCV
-        landmarks: Lista de landmarks do MediaPipe
-        thumb_landmark: Landmark do polegar
-        middle_landmark: Landmark do dedo médio
-        index_landmark: Landmark do dedo indicador
-        single_click_threshold: Limiar para clique simples
-        double_click_threshold: Limiar para clique duplo
+        circles: Lista de tuplas ((cx, cy), raio, cor, espessura)
     """
-    if landmarks is None:
-        return frame
-    
-    h, w = frame.shape[:2]
-    
-    # IMPORTANTE: Como a imagem foi invertida antes do MediaPipe processar,
-    # os landmarks estão nas coordenadas da imagem invertida.
-    # Mas o frame que recebemos aqui já está na imagem invertida,
-    # então as coordenadas dos landmarks devem corresponder diretamente.
-    # No entanto, se houver problemas de alinhamento, pode ser necessário
-    # inverter as coordenadas X. Vamos usar as coordenadas diretamente primeiro.
-    
+    circle = _cv2_circle
+    groups = {}
+    for center, radius, color, thickness in circles:
+        if thickness < 0:
+            circle(frame, center, radius, color, thickness, _LINE_AA)
+        else:
+            groups.setdefault((color, thickness), []).append((center, radius))
+
+    for (color, thickness), items in groups.items():
+        centers = np.array([c for c, _ in items], dtype=np.float32)
+        radii = np.array([r for _, r in items], dtype=np.float32)
+        polys = (_UNIT_CIRCLE[None, :, :] * radii[:, None, None] +
+                 centers[:, None, :]).astype(np.int32)
+        _cv2_polylines(frame, polys, True, color, thickness, _LINE_AA)
+
+
+def draw_gesture_feedback(frame, landmarks, ctx: RenderContext = None,
+                          single_click_threshold: float = 0.05,
+                          double_click_threshold: float = 0.05,
+                          overlay: Overlay = None):
+    """
+    Desenha feedback visual quando gestos estão próximos do limiar
+    (modifica o frame in-place). Sai imediatamente - antes de qualquer
+    acesso a frame.shape ou conversão - se os landmarks exigidos pelos
+    gestos não estão presentes.
+
+    Args:
+        frame: Frame OpenCV (anotado in-place, ou via overlay)
+        landmarks: Array (21, 3) float32 de landmarks_to_array
+        ctx: RenderContext reutilizado entre frames; se None, a escala é
+            recalculada nesta chamada
+        single_click_threshold: Limiar para clique simples (coordenadas
+            normalizadas, como em MouseController)
+        double_click_threshold: Limiar para clique duplo (idem)
+        overlay: Overlay persistente opcional; se fornecido, desenha nele
+            em vez do frame (o chamador compõe com overlay.composite)
+    """
+    # Guarda única consolidada: cobre None, array vazio e arrays curtos
+    # demais para os landmarks dos gestos (maior índice usado = dedo médio)
+    if landmarks is None or len(landmarks) <= LANDMARK_MIDDLE:
+        return
+
+    if ctx is None:
+        ctx = RenderContext()
+    ctx.update(frame)
+    if overlay is not None:
+        frame = overlay.get(frame.shape)
+        overlay.dirty = True
+
+    # IMPORTANTE: o frame aqui está na orientação original da câmera (o
+    # espelhamento é aplicado apenas no preview, na saída do recv), então
+    # as coordenadas normalizadas dos landmarks são usadas diretamente.
+
+    # Pré-filtros de caixa (L-infinito) ANTES de qualquer conversão de
+    # pixel: rejeitam o caso comum de dedos afastados com 4 subtrações e
+    # 4 comparações
+    near_single = _bbox_close(LANDMARK_THUMB, LANDMARK_MIDDLE, landmarks,
+                              single_click_threshold * 1.5)
+    near_double = _bbox_close(LANDMARK_THUMB, LANDMARK_INDEX_FINGER, landmarks,
+                              double_click_threshold * 1.5)
+
+    if not (near_single or near_double):
+        # Caminho rápido (quase todos os frames): nenhum gesto perto de
+        # disparar - só os destaques permanentes do indicador e da palma,
+        # convertendo apenas esses dois pontos para pixels
+        pts_px = (landmarks[(LANDMARK_INDEX_FINGER, LANDMARK_WRIST), :2]
+                  * ctx.scale_wh).astype(np.int32)
+        batch_draw_circles(frame, [
+            ((int(pts_px[0, 0]), int(pts_px[0, 1])), 12, COLOR_GREEN, 2),
+            ((int(pts_px[1, 0]), int(pts_px[1, 1])), 15, COLOR_GREEN, 4),
+        ])
+        return
+
+    # Converte os quatro pontos usados (polegar, médio, indicador, palma)
+    # para pixels de uma só vez - cada um era recalculado por branch
+    pts_px = (landmarks[
+        (LANDMARK_THUMB, LANDMARK_MIDDLE, LANDMARK_INDEX_FINGER, LANDMARK_WRIST),
+        :2
+    ] * ctx.scale_wh).astype(np.int32)
+    thumb_px = (int(pts_px[0, 0]), int(pts_px[0, 1]))
+    middle_px = (int(pts_px[1, 0]), int(pts_px[1, 1]))
+    index_px = (int(pts_px[2, 0]), int(pts_px[2, 1]))
+    palm_px = (int(pts_px[3, 0]), int(pts_px[3, 1]))
+
+    # Limiares ao quadrado, calculados uma vez - as distâncias abaixo são
+    # comparadas sem raiz quadrada
+    single_sq = single_click_threshold * single_click_threshold
+    double_sq = double_click_threshold * double_click_threshold
+    # Mostra feedback antes do limiar (1.5x)
+    single_visual_sq = single_sq * 2.25
+    double_visual_sq = double_sq * 2.25
+
+    # Acumula os círculos dos branches ativos e desenha tudo em lote no final
+    circles = []
+    line = _cv2_line  # alias local - LOAD_FAST nos branches quentes
+
+    # Algum gesto passou no pré-filtro: as duas distâncias saem em uma
+    # única chamada vetorizada
+    dists_sq = calculate_distances_batch(GESTURE_PAIRS, landmarks,
+                                         squared=True)
+
     # Clique simples: polegar + médio
-    if thumb_landmark and middle_landmark:
-        distance_single = calculate_distance(thumb_landmark, middle_landmark)
-        threshold_visual = single_click_threshold * 1.5  # Mostra feedback antes do limiar
-        
-        if distance_single < threshold_visual:
-            # Converte coordenadas normalizadas para pixels
-            # IMPORTANTE: A imagem foi invertida antes do MediaPipe processar.
-            # Os landmarks foram calculados na imagem invertida, mas o MediaPipe
-            # desenha os landmarks corretamente nessa imagem invertida.
-            # Para alinhar nossos círculos com os landmarks do MediaPipe,
-            # precisamos inverter as coordenadas X ao desenhar.
-            x1 = int((1.0 - thumb_landmark.x) * w)  # Inverte X para alinhar
-            y1 = int(thumb_landmark.y * h)
-            x2 = int((1.0 - middle_landmark.x) * w)  # Inverte X para alinhar
-            y2 = int(middle_landmark.y * h)
-            
+    if near_single:
+        distance_single = float(dists_sq[0])
+
+        if distance_single < single_visual_sq:
             # Círculos nas pontas dos dedos (polegar e médio)
-            cv2.circle(frame, (x1, y1), 10, COLOR_BLUE, 2)
-            cv2.circle(frame, (x2, y2), 10, COLOR_BLUE, 2)
-            
+            circles.append((thumb_px, 10, COLOR_BLUE, 2))
+            circles.append((middle_px, 10, COLOR_BLUE, 2))
+
             # Linha conectando os dedos
-            if distance_single < single_click_threshold:
-                cv2.line(frame, (x1, y1), (x2, y2), COLOR_BLUE, 3)
+            if distance_single < single_sq:
+                line(frame, thumb_px, middle_px, COLOR_BLUE, 3, _LINE_AA)
             else:
-                cv2.line(frame, (x1, y1), (x2, y2), COLOR_BLUE, 1)
-    
+                line(frame, thumb_px, middle_px, COLOR_BLUE, 1, _LINE_AA)
+
     # Clique duplo: polegar + indicador
-    if thumb_landmark and index_landmark:
-        distance_double = calculate_distance(thumb_landmark, index_landmark)
-        threshold_visual = double_click_threshold * 1.5
-        
-        if distance_double < threshold_visual:
-            # Converte coordenadas normalizadas para pixels
-            # Inverte X para corresponder à imagem invertida
-            x1 = int((1.0 - thumb_landmark.x) * w)  # Inverte X
-            y1 = int(thumb_landmark.y * h)
-            x2 = int((1.0 - index_landmark.x) * w)  # Inverte X
-            y2 = int(index_landmark.y * h)
-            
+    if near_double:
+        distance_double = float(dists_sq[1])
+
+        if distance_double < double_visual_sq:
             # Círculos nas pontas dos dedos (polegar e indicador)
-            cv2.circle(frame, (x1, y1), 10, COLOR_YELLOW, 2)
-            cv2.circle(frame, (x2, y2), 10, COLOR_YELLOW, 2)
-            
+            circles.append((thumb_px, 10, COLOR_YELLOW, 2))
+            circles.append((index_px, 10, COLOR_YELLOW, 2))
+
             # Linha conectando os dedos
-            if distance_double < double_click_threshold:
-                cv2.line(frame, (x1, y1), (x2, y2), COLOR_YELLOW, 3)
+            if distance_double < double_sq:
+                line(frame, thumb_px, index_px, COLOR_YELLOW, 3, _LINE_AA)
             else:
-                cv2.line(frame, (x1, y1), (x2, y2), COLOR_YELLOW, 1)
-    
+                line(frame, thumb_px, index_px, COLOR_YELLOW, 1, _LINE_AA)
+
     # Destaque especial para o dedo indicador (feedback visual)
-    if index_landmark:
-        x = int((1.0 - index_landmark.x) * w)  # Inverte X
-        y = int(index_landmark.y * h)
-        cv2.circle(frame, (x, y), 12, COLOR_GREEN, 2)
-    
+    circles.append((index_px, 12, COLOR_GREEN, 2))
+
     # Destaque para a palma da mão (usada para movimento do cursor)
-    if landmarks is not None and len(landmarks.landmark) > 0:
-        palm = landmarks.landmark[0]  # Landmark 0 = pulso/palma
-        x = int((1.0 - palm.x) * w)  # Inverte X
-        y = int(palm.y * h)
-        cv2.circle(frame, (x, y), 15, COLOR_GREEN, 4)  # Círculo maior para a palma
-    
-    return frame
+    circles.append((palm_px, 15, COLOR_GREEN, 4))  # Círculo maior para a palma
 
+    batch_draw_circles(frame, circles)